@@ -5,13 +5,17 @@ DuckDB Client CLI Module
 """
 
 import argparse
+import shlex
 import sys
 import logging
 from pathlib import Path
-from typing import Optional
-from tabulate import tabulate
+from typing import List, Optional, Tuple
 
-from .client import DuckDBClient
+from .client import DEFAULT_PARQUET_COMPRESSION, DEFAULT_PARQUET_ROW_GROUP_SIZE, _is_read_only_query
+from .formatter import print_arrow
+
+# DuckDBClient（duckdb, pyarrow）は import コストが大きいため、
+# `--help` 等で不要な初期化を避けるよう使用箇所で遅延 import する
 
 # ロガー設定
 logging.basicConfig(
@@ -21,184 +25,229 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 対話モードのプロンプト
+REPL_PROMPT = 'duckdb> '
+
+# 読み取り専用で接続するコマンド（query は文の種類から判定する）
+READ_ONLY_COMMANDS = frozenset({'tables', 'describe', 'sample', 'export-csv', 'export-parquet'})
+
+# query / file コマンドで表示する最大行数のデフォルト
+DEFAULT_MAX_ROWS = 1000
 
-def print_dataframe(df, format_style: str = "psql"):
+
+def _is_read_only(args) -> bool:
     """
-    DataFrameを整形して表示
+    コマンドを読み取り専用接続で実行できるかを判定
+
+    インメモリDBと未作成のファイルDBは読み取り専用で開けないため対象外とする。
 
     Args:
-        df: 表示するDataFrame
-        format_style: テーブル表示スタイル（psql, grid, simple等）
+        args: コマンドライン引数
+
+    Returns:
+        読み取り専用で接続する場合はTrue
     """
-    if len(df) == 0:
-        print("No results.")
-        return
+    if args.db == ':memory:' or not Path(args.db).exists():
+        return False
+    if args.command in READ_ONLY_COMMANDS:
+        return True
+    if args.command == 'query':
+        return _is_read_only_query(args.query)
+    return False
+
 
-    print(tabulate(df, headers='keys', tablefmt=format_style, showindex=False))
-    print(f"\n({len(df)} rows)")
+def _max_rows(args) -> Optional[int]:
+    """表示最大行数を取得（0以下は無制限）"""
+    return args.max_rows if args.max_rows > 0 else None
 
 
-def cmd_query(args):
+def cmd_query(client, args):
     """クエリ実行コマンド"""
-    with DuckDBClient(args.db) as client:
-        try:
-            result = client.execute_query(args.query)
-
-            # CSV出力オプションが指定されている場合
-            if args.output_csv:
-                result.to_csv(args.output_csv, index=False)
-                print(f"Successfully exported {len(result)} rows to: {args.output_csv}")
-            # Parquet出力オプションが指定されている場合
-            elif args.output_parquet:
-                client.export_to_parquet(args.query, args.output_parquet)
-                print(f"Successfully exported to: {args.output_parquet}")
-            # 通常の画面表示
-            else:
-                print_dataframe(result, args.format)
-        except Exception as e:
-            logger.error(f"Query execution failed: {e}")
-            sys.exit(1)
+    try:
+        # CSV出力オプションが指定されている場合
+        if args.output_csv:
+            client.export_to_csv(args.query, args.output_csv)
+            print(f"Successfully exported to: {args.output_csv}")
+        # Parquet出力オプションが指定されている場合
+        elif args.output_parquet:
+            client.export_to_parquet(args.query, args.output_parquet)
+            print(f"Successfully exported to: {args.output_parquet}")
+        # 通常の画面表示
+        else:
+            # 表示する行数だけを取得し、結果全体はクライアント側に展開しない
+            result = client.execute_query_arrow(args.query, max_rows=_max_rows(args))
+            print_arrow(result, args.format, _max_rows(args))
+    except Exception as e:
+        logger.error(f"Query execution failed: {e}")
+        sys.exit(1)
 
 
-def cmd_file(args):
+def cmd_file(client, args):
     """SQLファイル実行コマンド"""
-    with DuckDBClient(args.db) as client:
-        try:
-            result = client.execute_file(args.file)
-            print_dataframe(result, args.format)
-        except Exception as e:
-            logger.error(f"File execution failed: {e}")
-            sys.exit(1)
+    try:
+        result = client.execute_file_arrow(args.file, max_rows=_max_rows(args))
+        print_arrow(result, args.format, _max_rows(args))
+    except Exception as e:
+        logger.error(f"File execution failed: {e}")
+        sys.exit(1)
 
 
-def cmd_tables(args):
+def cmd_tables(client, args):
     """テーブル一覧表示コマンド"""
-    with DuckDBClient(args.db) as client:
-        try:
-            result = client.show_tables()
-            print_dataframe(result, args.format)
-        except Exception as e:
-            logger.error(f"Failed to show tables: {e}")
-            sys.exit(1)
+    try:
+        result = client.show_tables_arrow()
+        print_arrow(result, args.format)
+    except Exception as e:
+        logger.error(f"Failed to show tables: {e}")
+        sys.exit(1)
 
 
-def cmd_describe(args):
+def cmd_describe(client, args):
     """テーブル構造表示コマンド"""
-    with DuckDBClient(args.db) as client:
-        try:
-            result = client.describe_table(args.table)
-            print_dataframe(result, args.format)
-        except Exception as e:
-            logger.error(f"Failed to describe table: {e}")
-            sys.exit(1)
+    try:
+        result = client.describe_table_arrow(args.table)
+        print_arrow(result, args.format)
+    except Exception as e:
+        logger.error(f"Failed to describe table: {e}")
+        sys.exit(1)
 
 
-def cmd_sample(args):
+def cmd_sample(client, args):
     """サンプルデータ表示コマンド"""
-    with DuckDBClient(args.db) as client:
-        try:
-            result = client.get_table_sample(args.table, args.limit)
-            print_dataframe(result, args.format)
-        except Exception as e:
-            logger.error(f"Failed to get sample data: {e}")
-            sys.exit(1)
+    try:
+        result = client.get_table_sample_arrow(args.table, args.limit)
+        print_arrow(result, args.format)
+    except Exception as e:
+        logger.error(f"Failed to get sample data: {e}")
+        sys.exit(1)
 
 
-def cmd_export_csv(args):
+def cmd_export_csv(client, args):
     """CSV出力コマンド"""
-    with DuckDBClient(args.db) as client:
-        try:
-            client.export_to_csv(args.query, args.output)
-            print(f"Successfully exported to: {args.output}")
-        except Exception as e:
-            logger.error(f"CSV export failed: {e}")
-            sys.exit(1)
+    try:
+        client.export_to_csv(args.query, args.output)
+        print(f"Successfully exported to: {args.output}")
+    except Exception as e:
+        logger.error(f"CSV export failed: {e}")
+        sys.exit(1)
 
 
-def cmd_export_parquet(args):
+def cmd_export_parquet(client, args):
     """Parquet出力コマンド"""
-    with DuckDBClient(args.db) as client:
-        try:
-            client.export_to_parquet(args.query, args.output)
-            print(f"Successfully exported to: {args.output}")
-        except Exception as e:
-            logger.error(f"Parquet export failed: {e}")
-            sys.exit(1)
+    try:
+        client.export_to_parquet(
+            args.query,
+            args.output,
+            partition_by=args.partition_by,
+            compression=args.compression,
+            row_group_size=args.row_group_size,
+        )
+        print(f"Successfully exported to: {args.output}")
+    except Exception as e:
+        logger.error(f"Parquet export failed: {e}")
+        sys.exit(1)
 
 
-def cmd_import_csv(args):
+def cmd_import_csv(client, args):
     """CSVインポートコマンド"""
-    with DuckDBClient(args.db) as client:
-        try:
-            client.import_csv(args.file, args.table)
-            print(f"Successfully imported {args.file} to table '{args.table}'")
-        except Exception as e:
-            logger.error(f"CSV import failed: {e}")
-            sys.exit(1)
+    try:
+        schema = dict(args.columns) if args.columns else None
+        client.import_csv(args.file, args.table, schema=schema, sample_size=args.sample_size)
+        print(f"Successfully imported {args.file} to table '{args.table}'")
+    except Exception as e:
+        logger.error(f"CSV import failed: {e}")
+        sys.exit(1)
 
 
-def cmd_import_parquet(args):
+def cmd_import_parquet(client, args):
     """Parquetインポートコマンド"""
-    with DuckDBClient(args.db) as client:
-        try:
-            client.import_parquet(args.file, args.table)
-            print(f"Successfully imported {args.file} to table '{args.table}'")
-        except Exception as e:
-            logger.error(f"Parquet import failed: {e}")
-            sys.exit(1)
+    try:
+        client.import_parquet(args.file, args.table)
+        print(f"Successfully imported {args.file} to table '{args.table}'")
+    except Exception as e:
+        logger.error(f"Parquet import failed: {e}")
+        sys.exit(1)
 
 
-def create_parser() -> argparse.ArgumentParser:
+def cmd_repl(client, args):
     """
-    コマンドライン引数パーサーを作成
+    対話モードコマンド
 
-    Returns:
-        設定済みのArgumentParser
+    1つの接続を維持したまま入力行ごとにサブコマンドを実行する。
+    サブコマンド名で始まらない行はSQLクエリとして実行する。
     """
-    parser = argparse.ArgumentParser(
-        prog='duckdb-cli',
-        description='Simple CLI tool for DuckDB',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  # テーブル一覧表示
-  duckdb-cli --db mydb.duckdb tables
+    parser = _create_repl_parser()
+    print("Connected to DuckDB. Type 'help' for commands, 'exit' to quit.")
 
-  # クエリ実行
-  duckdb-cli --db mydb.duckdb query "SELECT * FROM users LIMIT 10"
+    while True:
+        try:
+            line = input(REPL_PROMPT).strip()
+        except (EOFError, KeyboardInterrupt):
+            print()
+            break
+
+        if not line:
+            continue
+        if line in ('exit', 'quit'):
+            break
+        if line == 'help':
+            parser.print_help()
+            continue
 
-  # SQLファイル実行
-  duckdb-cli --db mydb.duckdb file queries.sql
+        try:
+            tokens = shlex.split(line)
+        except ValueError:
+            tokens = []
 
-  # テーブル構造確認
-  duckdb-cli --db mydb.duckdb describe users
+        # 各コマンドのエラー時の sys.exit / argparse のエラー終了で対話モードを抜けない
+        try:
+            if tokens and tokens[0] in _SUBPARSER_BUILDERS:
+                repl_args = parser.parse_args(tokens)
+            else:
+                repl_args = parser.parse_args(['query', line])
+            repl_args.func(client, repl_args)
+        except SystemExit:
+            continue
+        except KeyboardInterrupt:
+            # Ctrl-C は実行中のクエリのみ中断し、接続を維持したまま対話モードを続ける
+            client.conn.interrupt()
+            print("\nInterrupted.")
 
-  # CSV出力
-  duckdb-cli --db mydb.duckdb export-csv "SELECT * FROM sales" output.csv
 
-  # CSVインポート
-  duckdb-cli --db mydb.duckdb import-csv data.csv users
-        """
-    )
+def _column_spec(value: str) -> Tuple[str, str]:
+    """
+    `NAME:TYPE` 形式の列定義を解析
 
-    # 共通オプション
-    parser.add_argument(
-        '--db',
-        type=str,
-        default=':memory:',
-        help='Database file path (default: in-memory)'
-    )
+    Args:
+        value: 列定義文字列
 
-    parser.add_argument(
-        '-v', '--verbose',
-        action='store_true',
-        help='Enable verbose logging'
-    )
+    Returns:
+        (列名, 型名) のタプル
+    """
+    name, sep, dtype = value.partition(':')
+    if not sep or not name or not dtype:
+        raise argparse.ArgumentTypeError(f"invalid column definition (expected NAME:TYPE): {value}")
+    return name, dtype
 
-    # サブコマンド
-    subparsers = parser.add_subparsers(dest='command', help='Available commands')
 
-    # query コマンド
+def _column_list(value: str) -> List[str]:
+    """
+    カンマ区切りの列名リストを解析
+
+    Args:
+        value: カンマ区切りの列名
+
+    Returns:
+        列名のリスト
+    """
+    columns = [col.strip() for col in value.split(',') if col.strip()]
+    if not columns:
+        raise argparse.ArgumentTypeError(f"invalid column list: {value}")
+    return columns
+
+
+def _add_query_parser(subparsers) -> None:
+    """query サブコマンドを登録"""
     parser_query = subparsers.add_parser('query', help='Execute SQL query')
     parser_query.add_argument('query', type=str, help='SQL query to execute')
     parser_query.add_argument(
@@ -222,9 +271,19 @@ Examples:
         metavar='FILE',
         help='Export result to Parquet file instead of displaying'
     )
+    parser_query.add_argument(
+        '--max-rows',
+        dest='max_rows',
+        type=int,
+        default=DEFAULT_MAX_ROWS,
+        metavar='N',
+        help=f'Maximum number of rows to display, 0 for no limit (default: {DEFAULT_MAX_ROWS})'
+    )
     parser_query.set_defaults(func=cmd_query)
 
-    # file コマンド
+
+def _add_file_parser(subparsers) -> None:
+    """file サブコマンドを登録"""
     parser_file = subparsers.add_parser('file', help='Execute SQL file')
     parser_file.add_argument('file', type=str, help='SQL file path')
     parser_file.add_argument(
@@ -234,9 +293,19 @@ Examples:
         choices=['psql', 'grid', 'simple', 'plain', 'markdown'],
         help='Output format (default: psql)'
     )
+    parser_file.add_argument(
+        '--max-rows',
+        dest='max_rows',
+        type=int,
+        default=DEFAULT_MAX_ROWS,
+        metavar='N',
+        help=f'Maximum number of rows to display, 0 for no limit (default: {DEFAULT_MAX_ROWS})'
+    )
     parser_file.set_defaults(func=cmd_file)
 
-    # tables コマンド
+
+def _add_tables_parser(subparsers) -> None:
+    """tables サブコマンドを登録"""
     parser_tables = subparsers.add_parser('tables', help='List all tables')
     parser_tables.add_argument(
         '--format',
@@ -247,7 +316,9 @@ Examples:
     )
     parser_tables.set_defaults(func=cmd_tables)
 
-    # describe コマンド
+
+def _add_describe_parser(subparsers) -> None:
+    """describe サブコマンドを登録"""
     parser_describe = subparsers.add_parser('describe', help='Describe table structure')
     parser_describe.add_argument('table', type=str, help='Table name')
     parser_describe.add_argument(
@@ -259,7 +330,9 @@ Examples:
     )
     parser_describe.set_defaults(func=cmd_describe)
 
-    # sample コマンド
+
+def _add_sample_parser(subparsers) -> None:
+    """sample サブコマンドを登録"""
     parser_sample = subparsers.add_parser('sample', help='Show sample data from table')
     parser_sample.add_argument('table', type=str, help='Table name')
     parser_sample.add_argument(
@@ -277,36 +350,236 @@ Examples:
     )
     parser_sample.set_defaults(func=cmd_sample)
 
-    # export-csv コマンド
+
+def _add_export_csv_parser(subparsers) -> None:
+    """export-csv サブコマンドを登録"""
     parser_export_csv = subparsers.add_parser('export-csv', help='Export query result to CSV')
     parser_export_csv.add_argument('query', type=str, help='SQL query')
     parser_export_csv.add_argument('output', type=str, help='Output CSV file path')
     parser_export_csv.set_defaults(func=cmd_export_csv)
 
-    # export-parquet コマンド
+
+def _add_export_parquet_parser(subparsers) -> None:
+    """export-parquet サブコマンドを登録"""
     parser_export_parquet = subparsers.add_parser('export-parquet', help='Export query result to Parquet')
     parser_export_parquet.add_argument('query', type=str, help='SQL query')
-    parser_export_parquet.add_argument('output', type=str, help='Output Parquet file path')
+    parser_export_parquet.add_argument('output', type=str, help='Output Parquet file path (directory with --partition-by)')
+    parser_export_parquet.add_argument(
+        '--partition-by',
+        dest='partition_by',
+        type=_column_list,
+        metavar='COL[,COL...]',
+        help='Write a Hive-partitioned directory split by the given columns'
+    )
+    parser_export_parquet.add_argument(
+        '--compression',
+        type=str,
+        default=DEFAULT_PARQUET_COMPRESSION,
+        choices=['zstd', 'snappy', 'gzip', 'uncompressed'],
+        help=f'Parquet compression codec (default: {DEFAULT_PARQUET_COMPRESSION})'
+    )
+    parser_export_parquet.add_argument(
+        '--row-group-size',
+        dest='row_group_size',
+        type=int,
+        default=DEFAULT_PARQUET_ROW_GROUP_SIZE,
+        metavar='N',
+        help=f'Rows per Parquet row group (default: {DEFAULT_PARQUET_ROW_GROUP_SIZE})'
+    )
     parser_export_parquet.set_defaults(func=cmd_export_parquet)
 
-    # import-csv コマンド
+
+def _add_import_csv_parser(subparsers) -> None:
+    """import-csv サブコマンドを登録"""
     parser_import_csv = subparsers.add_parser('import-csv', help='Import CSV file to table')
     parser_import_csv.add_argument('file', type=str, help='CSV file path')
     parser_import_csv.add_argument('table', type=str, help='Target table name')
+    parser_import_csv.add_argument(
+        '--column',
+        dest='columns',
+        type=_column_spec,
+        action='append',
+        metavar='NAME:TYPE',
+        help='Column definition; repeat for each column to skip type detection and load with COPY'
+    )
+    parser_import_csv.add_argument(
+        '--sample-size',
+        dest='sample_size',
+        type=int,
+        metavar='N',
+        help='Rows sampled for type detection (-1: scan all rows)'
+    )
     parser_import_csv.set_defaults(func=cmd_import_csv)
 
-    # import-parquet コマンド
+
+def _add_import_parquet_parser(subparsers) -> None:
+    """import-parquet サブコマンドを登録"""
     parser_import_parquet = subparsers.add_parser('import-parquet', help='Import Parquet file to table')
     parser_import_parquet.add_argument('file', type=str, help='Parquet file path')
     parser_import_parquet.add_argument('table', type=str, help='Target table name')
     parser_import_parquet.set_defaults(func=cmd_import_parquet)
 
+
+def _add_repl_parser(subparsers) -> None:
+    """repl サブコマンドを登録"""
+    parser_repl = subparsers.add_parser('repl', help='Start interactive session on a single connection')
+    parser_repl.set_defaults(func=cmd_repl)
+
+
+# サブコマンド名 → パーサー登録関数（登録順がヘルプの表示順になる）
+_SUBPARSER_BUILDERS = {
+    'query': _add_query_parser,
+    'file': _add_file_parser,
+    'tables': _add_tables_parser,
+    'describe': _add_describe_parser,
+    'sample': _add_sample_parser,
+    'export-csv': _add_export_csv_parser,
+    'export-parquet': _add_export_parquet_parser,
+    'import-csv': _add_import_csv_parser,
+    'import-parquet': _add_import_parquet_parser,
+    'repl': _add_repl_parser,
+}
+
+
+def create_parser(command: Optional[str] = None) -> argparse.ArgumentParser:
+    """
+    コマンドライン引数パーサーを作成
+
+    Args:
+        command: 登録するサブコマンド名。
+                Noneの場合は全サブコマンドを登録。
+
+    Returns:
+        設定済みのArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog='duckdb-cli',
+        description='Simple CLI tool for DuckDB',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # テーブル一覧表示
+  duckdb-cli --db mydb.duckdb tables
+
+  # クエリ実行
+  duckdb-cli --db mydb.duckdb query "SELECT * FROM users LIMIT 10"
+
+  # SQLファイル実行
+  duckdb-cli --db mydb.duckdb file queries.sql
+
+  # テーブル構造確認
+  duckdb-cli --db mydb.duckdb describe users
+
+  # CSV出力
+  duckdb-cli --db mydb.duckdb export-csv "SELECT * FROM sales" output.csv
+
+  # CSVインポート
+  duckdb-cli --db mydb.duckdb import-csv data.csv users
+
+  # 対話モード（1つの接続を使い回す）
+  duckdb-cli --db mydb.duckdb repl
+        """
+    )
+
+    # 共通オプション
+    parser.add_argument(
+        '--db',
+        type=str,
+        default=':memory:',
+        help='Database file path (default: in-memory)'
+    )
+
+    parser.add_argument(
+        '--threads',
+        type=int,
+        metavar='N',
+        help='Number of DuckDB worker threads (default: number of CPU cores)'
+    )
+
+    parser.add_argument(
+        '--memory-limit',
+        dest='memory_limit',
+        type=str,
+        metavar='SIZE',
+        help='DuckDB memory limit, e.g. 8GB (default: DuckDB default)'
+    )
+
+    parser.add_argument(
+        '--preserve-order',
+        dest='preserve_order',
+        action='store_true',
+        help='Preserve insertion order for queries without ORDER BY (disables some parallelism)'
+    )
+
+    parser.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help='Enable verbose logging'
+    )
+
+    # サブコマンド
+    subparsers = parser.add_subparsers(dest='command', help='Available commands')
+
+    if command is not None:
+        _SUBPARSER_BUILDERS[command](subparsers)
+    else:
+        for add_parser in _SUBPARSER_BUILDERS.values():
+            add_parser(subparsers)
+
     return parser
 
 
+# 共通オプション（サブコマンド推定時に読み飛ばす）
+_GLOBAL_VALUE_OPTIONS = ('--db', '--threads', '--memory-limit')
+_GLOBAL_FLAG_OPTIONS = ('-v', '--verbose', '--preserve-order')
+
+
+def _create_repl_parser() -> argparse.ArgumentParser:
+    """
+    対話モード用の引数パーサーを作成
+
+    Returns:
+        repl 以外の全サブコマンドを登録したArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog='', add_help=False)
+    subparsers = parser.add_subparsers(dest='command', title='commands')
+    for command, add_parser in _SUBPARSER_BUILDERS.items():
+        if command != 'repl':
+            add_parser(subparsers)
+    return parser
+
+
+def _sniff_subcommand(argv: List[str]) -> Optional[str]:
+    """
+    引数列からサブコマンド名を推定
+
+    共通オプションを読み飛ばし、最初の位置引数を既知のサブコマンドと照合する。
+    トップレベルの `--help` や未知のオプションが先に現れた場合は None を返し、
+    全サブコマンドを登録した通常のパーサーにフォールバックさせる。
+
+    Args:
+        argv: プログラム名を除いたコマンドライン引数
+
+    Returns:
+        サブコマンド名。特定できない場合はNone
+    """
+    args = iter(argv)
+    for arg in args:
+        if arg in _GLOBAL_VALUE_OPTIONS:
+            next(args, None)
+        elif arg.split('=', 1)[0] in _GLOBAL_VALUE_OPTIONS or arg in _GLOBAL_FLAG_OPTIONS:
+            continue
+        elif arg.startswith('-'):
+            return None
+        else:
+            return arg if arg in _SUBPARSER_BUILDERS else None
+    return None
+
+
 def main():
     """CLIメインエントリーポイント"""
-    parser = create_parser()
+    # 対象サブコマンドのパーサーのみ構築して起動を高速化
+    parser = create_parser(_sniff_subcommand(sys.argv[1:]))
     args = parser.parse_args()
 
     # ログレベル設定
@@ -319,9 +592,18 @@ def main():
         parser.print_help()
         sys.exit(0)
 
-    # コマンド実行
+    # コマンド実行（接続はコマンド単位ではなくここで1つだけ開く）
     if hasattr(args, 'func'):
-        args.func(args)
+        from .client import DuckDBClient
+
+        with DuckDBClient(
+            args.db,
+            threads=args.threads,
+            memory_limit=args.memory_limit,
+            preserve_insertion_order=args.preserve_order,
+            read_only=_is_read_only(args),
+        ) as client:
+            args.func(client, args)
     else:
         parser.print_help()
         sys.exit(1)
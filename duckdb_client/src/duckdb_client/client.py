@@ -4,15 +4,163 @@ DuckDB Client Core Module
 DuckDBへの接続とクエリ実行を管理するコアクラス。
 """
 
-import duckdb
+from __future__ import annotations
+
 import logging
+import re
 from pathlib import Path
-from typing import Optional, Union, List, Dict, Any
-import pandas as pd
+from typing import TYPE_CHECKING, Optional, Union, List, Dict, Any
+
+# duckdb / pandas / pyarrow は import コストが大きいため、実際に使うメソッド内で遅延 import する
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
 
 # ロガー設定
 logger = logging.getLogger(__name__)
 
+# Parquetエクスポートのデフォルト設定
+DEFAULT_PARQUET_COMPRESSION = "zstd"
+DEFAULT_PARQUET_ROW_GROUP_SIZE = 122880
+
+# 読み取り専用接続で実行できる文の種類（duckdb.StatementType の名前）
+_READ_ONLY_STATEMENT_TYPES = frozenset({"SELECT", "EXPLAIN"})
+
+# SELECT/EXPLAIN 内でもデータベースを更新する関数・構文
+_WRITE_FUNCTION_PATTERN = re.compile(r"\b(nextval|setval)\s*\(|\bANALY[SZ]E\b", re.IGNORECASE)
+
+# 結果セットを返さない文の種類（duckdb.StatementType の名前、結果の取得を省略する）
+_NO_RESULT_STATEMENT_TYPES = frozenset({
+    "INSERT", "UPDATE", "DELETE", "CREATE", "CREATE_FUNC", "ALTER", "DROP",
+    "COPY", "COPY_DATABASE", "EXPORT", "TRANSACTION", "SET", "VARIABLE_SET",
+    "ATTACH", "DETACH", "LOAD", "VACUUM", "PREPARE",
+})
+
+
+def _is_read_only_query(query: str) -> bool:
+    """
+    クエリを読み取り専用接続で実行できるかを判定
+
+    DuckDBのパーサーで文に分割し、単一のSELECT文（またはANALYZEを伴わないEXPLAIN）の
+    場合のみ読み取り専用とみなす。シーケンスを進める nextval / setval を含む場合や、
+    解析できない場合は読み書き可能として扱う。
+
+    Args:
+        query: SQLクエリ
+
+    Returns:
+        読み取り専用で実行できる場合はTrue
+    """
+    import duckdb
+
+    try:
+        statements = duckdb.extract_statements(query)
+    except Exception:
+        return False
+
+    if len(statements) != 1:
+        return False
+
+    statement = statements[0]
+    if statement.type.name not in _READ_ONLY_STATEMENT_TYPES:
+        return False
+    return _WRITE_FUNCTION_PATTERN.search(statement.query) is None
+
+
+def _returns_rows(statement) -> bool:
+    """
+    文が結果セットを返すかどうかを判定
+
+    判定できない種類の文は結果を返すものとして扱う。
+
+    Args:
+        statement: extract_statements() で取得したDuckDBの文
+
+    Returns:
+        結果セットを返す可能性がある場合はTrue
+    """
+    if statement.type.name not in _NO_RESULT_STATEMENT_TYPES:
+        return True
+    # INSERT/UPDATE/DELETE ... RETURNING は結果を返す
+    return "RETURNING" in statement.query.upper()
+
+
+def _as_subquery(query: str) -> str:
+    """
+    クエリをCOPY等のサブクエリとして埋め込める形に整える
+
+    Args:
+        query: SQLクエリ
+
+    Returns:
+        末尾のセミコロンを除去したクエリ
+    """
+    return query.strip().rstrip(';')
+
+
+def _quote_literal(value: Union[str, Path]) -> str:
+    """
+    値をSQLの文字列リテラルとしてクォート
+
+    Args:
+        value: クォートする値（ファイルパス等）
+
+    Returns:
+        シングルクォートで囲みエスケープした文字列
+    """
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _quote_name(name: str) -> str:
+    """
+    単一の名前をSQLの識別子としてクォート
+
+    Args:
+        name: クォートする名前
+
+    Returns:
+        ダブルクォートで囲みエスケープした識別子
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _is_quoted(part: str) -> bool:
+    """ダブルクォートで正しく囲まれた識別子かどうかを判定"""
+    return (
+        len(part) >= 2
+        and part.startswith('"')
+        and part.endswith('"')
+        and '"' not in part[1:-1].replace('""', '')
+    )
+
+
+def _quote_identifier(name: str) -> str:
+    """
+    テーブル名等をSQLの識別子としてクォート
+
+    `schema.table` 形式の場合はダブルクォートの外にあるドットで区切り、
+    各要素をそれぞれクォートする。クォート済みの要素はそのまま使う。
+
+    Args:
+        name: クォートする識別子
+
+    Returns:
+        ダブルクォートで囲みエスケープした識別子
+    """
+    parts = []
+    part = ''
+    in_quotes = False
+    for char in name:
+        if char == '"':
+            in_quotes = not in_quotes
+        if char == '.' and not in_quotes:
+            parts.append(part)
+            part = ''
+        else:
+            part += char
+    parts.append(part)
+    return '.'.join(part if _is_quoted(part) else _quote_name(part) for part in parts)
+
 
 class DuckDBClient:
     """
@@ -20,50 +168,101 @@ class DuckDBClient:
 
     DuckDBデータベースへの接続を管理し、クエリ実行や
     データのインポート/エクスポート機能を提供します。
+    接続はオブジェクト破棄時には閉じられないため、with構文で使用するか
+    明示的に close() を呼び出してください。
 
     Examples:
-        >>> client = DuckDBClient("mydb.duckdb")
-        >>> result = client.execute_query("SELECT * FROM users")
-        >>> client.close()
+        >>> with DuckDBClient("mydb.duckdb") as client:
+        ...     result = client.execute_query("SELECT * FROM users")
     """
 
-    def __init__(self, db_path: Optional[Union[str, Path]] = None):
+    # テーブル名は識別子としてクォートし、行数はパラメータとしてバインドする
+    _DESCRIBE_QUERY = "DESCRIBE {}"
+    _SAMPLE_QUERY = "SELECT * FROM {} LIMIT ?"
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = None,
+        threads: Optional[int] = None,
+        memory_limit: Optional[str] = None,
+        preserve_insertion_order: bool = False,
+        read_only: bool = False,
+    ):
         """
         DuckDBクライアントを初期化
 
         Args:
             db_path: データベースファイルのパス。
                     Noneの場合はインメモリDBを使用。
+            threads: クエリ実行スレッド数。
+                    Noneの場合はDuckDBのデフォルト（CPUコア数）を使用。
+            memory_limit: メモリ上限（例: "8GB"）。
+                    Noneの場合はDuckDBのデフォルトを使用。
+            preserve_insertion_order: ORDER BYのないクエリで挿入順を保持するか。
+                    Falseの場合は並列実行を優先する。
+            read_only: 読み取り専用で接続するか。
+                    Trueの場合はWALを使用せず、他プロセスと同時に読み取れる。
+                    既存のファイルDBでのみ指定可能。
         """
         self.db_path = str(db_path) if db_path else ":memory:"
+        self.threads = threads
+        self.memory_limit = memory_limit
+        self.preserve_insertion_order = preserve_insertion_order
+        self.read_only = read_only
         self.conn = None
         self._connect()
-        logger.info(f"Connected to DuckDB: {self.db_path}")
+        logger.info(f"Connected to DuckDB: {self.db_path}{' (read-only)' if read_only else ''}")
 
     def _connect(self) -> None:
         """データベースに接続"""
+        import duckdb
+
+        # 分析用途向けの設定
+        config: Dict[str, Any] = {
+            "preserve_insertion_order": self.preserve_insertion_order,
+        }
+        if self.threads is not None:
+            config["threads"] = self.threads
+        if self.memory_limit is not None:
+            config["memory_limit"] = self.memory_limit
+
         try:
-            self.conn = duckdb.connect(self.db_path)
+            self.conn = duckdb.connect(self.db_path, read_only=self.read_only, config=config)
+            # 進捗バーはセッション単位の設定のため接続後に無効化する（CLIでは表示しない）
+            self.conn.execute("SET enable_progress_bar = false")
         except Exception as e:
             logger.error(f"Failed to connect to database: {e}")
             raise
 
-    def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    def execute_query_arrow(
+        self,
+        query: str,
+        params: Optional[Union[List[Any], Dict[str, Any]]] = None,
+        max_rows: Optional[int] = None,
+    ) -> pa.Table:
         """
-        SQLクエリを実行してDataFrameで結果を返す
+        SQLクエリを実行してArrow Tableで結果を返す
+
+        pandasを経由せずDuckDBの列指向データをそのまま受け取るため、
+        表示やエクスポートのみを行う場合はこちらを使用する。
 
         Args:
             query: 実行するSQLクエリ
-            params: クエリパラメータ（オプション）
+            params: クエリパラメータ（オプション）。
+                    `?` には値のリスト、`$name` には辞書を指定する。
+            max_rows: 取得する最大行数（オプション）。
+                    指定した場合は結果をストリーミングで読み、max_rows + 1 行に
+                    達した時点で取得を打ち切る（超過行の有無の判定用に1行多く返す）。
 
         Returns:
-            クエリ結果のDataFrame
+            クエリ結果のArrow Table。
+            DDL/DML等の結果セットを返さない文の場合は空のTable
 
         Raises:
             Exception: クエリ実行に失敗した場合
 
         Examples:
-            >>> result = client.execute_query("SELECT * FROM users WHERE age > ?", {"age": 18})
+            >>> table = client.execute_query_arrow("SELECT * FROM users")
         """
         try:
             logger.debug(f"Executing query: {query}")
@@ -73,29 +272,96 @@ class DuckDBClient:
             else:
                 result = self.conn.execute(query)
 
-            # 結果をDataFrameに変換
-            df = result.fetchdf()
-            logger.info(f"Query executed successfully: {len(df)} rows returned")
-            return df
+            # 最後の文（execute() が結果を返す文）がDDL/DML等なら結果の取得を省略する
+            statements = self.conn.extract_statements(query)
+            if statements and not _returns_rows(statements[-1]):
+                import pyarrow as pa
+
+                logger.info("Statement executed successfully")
+                return pa.table({})
+
+            if max_rows is None:
+                # DuckDB 1.4以降の名称を優先し、古いバージョンでは旧名称を使用する
+                to_arrow_table = getattr(result, "to_arrow_table", None) or result.fetch_arrow_table
+                table = to_arrow_table()
+            else:
+                table = self._fetch_head(result, max_rows + 1)
+            logger.info(f"Query executed successfully: {table.num_rows} rows returned")
+            return table
 
         except Exception as e:
             logger.error(f"Query execution failed: {e}")
             logger.error(f"Query: {query}")
             raise
 
-    def execute_file(self, sql_file: Union[str, Path]) -> pd.DataFrame:
+    @staticmethod
+    def _fetch_head(result, limit: int) -> pa.Table:
         """
-        SQLファイルを読み込んで実行
+        クエリ結果の先頭行のみをレコードバッチ単位で取得
+
+        必要な行数に達した時点で読み込みを止め、残りの結果は取得しない。
+
+        Args:
+            result: 実行済みのDuckDB接続（結果ストリーム）
+            limit: 取得する最大行数
+
+        Returns:
+            先頭 limit 行以内のArrow Table
+        """
+        import pyarrow as pa
+
+        to_arrow_reader = getattr(result, "to_arrow_reader", None) or result.fetch_record_batch
+        reader = to_arrow_reader(limit)
+        batches = []
+        num_rows = 0
+        for batch in reader:
+            batches.append(batch)
+            num_rows += batch.num_rows
+            if num_rows >= limit:
+                break
+
+        return pa.Table.from_batches(batches, schema=reader.schema).slice(0, limit)
+
+    def execute_query(self, query: str, params: Optional[Union[List[Any], Dict[str, Any]]] = None) -> pd.DataFrame:
+        """
+        SQLクエリを実行してDataFrameで結果を返す
+
+        Args:
+            query: 実行するSQLクエリ
+            params: クエリパラメータ（オプション）。
+                    `?` には値のリスト、`$name` には辞書を指定する。
+
+        Returns:
+            クエリ結果のDataFrame。
+            DDL/DML等の結果セットを返さない文の場合は空のDataFrame
+
+        Raises:
+            Exception: クエリ実行に失敗した場合
+
+        Examples:
+            >>> result = client.execute_query("SELECT * FROM users WHERE age > ?", [18])
+        """
+        return self._to_pandas(self.execute_query_arrow(query, params))
+
+    def execute_file_arrow(self, sql_file: Union[str, Path], max_rows: Optional[int] = None) -> pa.Table:
+        """
+        SQLファイルを読み込んで実行し、最後の文の結果をArrow Tableで返す
+
+        ファイルを文単位に分割して順に実行し、結果の取得は最後の文のみ行う。
 
         Args:
             sql_file: SQLファイルのパス
+            max_rows: 取得する最大行数（オプション）。
+                    execute_query_arrow() と同様に max_rows + 1 行で打ち切る。
 
         Returns:
-            クエリ結果のDataFrame
+            最後の文の結果のArrow Table
 
         Examples:
-            >>> result = client.execute_file("queries/analysis.sql")
+            >>> table = client.execute_file_arrow("queries/analysis.sql")
         """
+        import pyarrow as pa
+
         sql_path = Path(sql_file)
 
         if not sql_path.exists():
@@ -106,7 +372,63 @@ class DuckDBClient:
         with open(sql_path, 'r', encoding='utf-8') as f:
             sql = f.read()
 
-        return self.execute_query(sql)
+        statements = self.conn.extract_statements(sql)
+        if not statements:
+            return pa.table({})
+
+        # 途中の文は結果を取得せずに実行のみ行う
+        for statement in statements[:-1]:
+            try:
+                logger.debug(f"Executing statement: {statement.query}")
+                self.conn.execute(statement.query)
+            except Exception as e:
+                logger.error(f"Query execution failed: {e}")
+                logger.error(f"Query: {statement.query}")
+                raise
+
+        return self.execute_query_arrow(statements[-1].query, max_rows=max_rows)
+
+    def execute_file(self, sql_file: Union[str, Path]) -> pd.DataFrame:
+        """
+        SQLファイルを読み込んで実行
+
+        Args:
+            sql_file: SQLファイルのパス
+
+        Returns:
+            最後の文の結果のDataFrame
+
+        Examples:
+            >>> result = client.execute_file("queries/analysis.sql")
+        """
+        return self._to_pandas(self.execute_file_arrow(sql_file))
+
+    @staticmethod
+    def _to_pandas(table: pa.Table) -> pd.DataFrame:
+        """
+        Arrow TableをDataFrameに変換
+
+        列はArrowのバッファを参照したまま変換され（数値・真偽値はゼロコピー）、
+        変換済みの列からArrow側のメモリを解放する。
+
+        Args:
+            table: 変換するArrow Table。変換後は使用できない。
+
+        Returns:
+            Arrow型を保持したDataFrame
+        """
+        import pandas as pd
+
+        return table.to_pandas(split_blocks=True, self_destruct=True, types_mapper=pd.ArrowDtype)
+
+    def show_tables_arrow(self) -> pa.Table:
+        """
+        データベース内のテーブル一覧をArrow Tableで取得
+
+        Returns:
+            テーブル一覧のArrow Table
+        """
+        return self.execute_query_arrow("SHOW TABLES")
 
     def show_tables(self) -> pd.DataFrame:
         """
@@ -115,7 +437,19 @@ class DuckDBClient:
         Returns:
             テーブル一覧のDataFrame
         """
-        return self.execute_query("SHOW TABLES")
+        return self._to_pandas(self.show_tables_arrow())
+
+    def describe_table_arrow(self, table_name: str) -> pa.Table:
+        """
+        テーブルのスキーマ情報をArrow Tableで取得
+
+        Args:
+            table_name: テーブル名
+
+        Returns:
+            テーブルスキーマのArrow Table
+        """
+        return self.execute_query_arrow(self._DESCRIBE_QUERY.format(_quote_identifier(table_name)))
 
     def describe_table(self, table_name: str) -> pd.DataFrame:
         """
@@ -127,7 +461,20 @@ class DuckDBClient:
         Returns:
             テーブルスキーマのDataFrame
         """
-        return self.execute_query(f"DESCRIBE {table_name}")
+        return self._to_pandas(self.describe_table_arrow(table_name))
+
+    def get_table_sample_arrow(self, table_name: str, limit: int = 10) -> pa.Table:
+        """
+        テーブルのサンプルデータをArrow Tableで取得
+
+        Args:
+            table_name: テーブル名
+            limit: 取得する行数
+
+        Returns:
+            サンプルデータのArrow Table
+        """
+        return self.execute_query_arrow(self._SAMPLE_QUERY.format(_quote_identifier(table_name)), [limit])
 
     def get_table_sample(self, table_name: str, limit: int = 10) -> pd.DataFrame:
         """
@@ -140,7 +487,7 @@ class DuckDBClient:
         Returns:
             サンプルデータのDataFrame
         """
-        return self.execute_query(f"SELECT * FROM {table_name} LIMIT {limit}")
+        return self._to_pandas(self.get_table_sample_arrow(table_name, limit))
 
     def export_to_csv(self, query: str, output_file: Union[str, Path]) -> None:
         """
@@ -156,40 +503,77 @@ class DuckDBClient:
         output_path = Path(output_file)
         logger.info(f"Exporting query result to CSV: {output_path}")
 
-        result = self.execute_query(query)
-        result.to_csv(output_path, index=False)
+        # DuckDBの組み込みCOPY機能を使用（並列書き込み、pandasを経由しない）
+        self.conn.execute(f"COPY ({_as_subquery(query)}) TO {_quote_literal(output_path)} (FORMAT CSV, HEADER)")
 
-        logger.info(f"Successfully exported {len(result)} rows to {output_path}")
+        logger.info(f"Successfully exported to {output_path}")
 
-    def export_to_parquet(self, query: str, output_file: Union[str, Path]) -> None:
+    def export_to_parquet(
+        self,
+        query: str,
+        output_file: Union[str, Path],
+        partition_by: Optional[List[str]] = None,
+        compression: str = DEFAULT_PARQUET_COMPRESSION,
+        row_group_size: int = DEFAULT_PARQUET_ROW_GROUP_SIZE,
+    ) -> None:
         """
         クエリ結果をParquetファイルにエクスポート
 
         Args:
             query: 実行するSQLクエリ
-            output_file: 出力Parquetファイルのパス
+            output_file: 出力Parquetファイルのパス。
+                    partition_by指定時は出力先ディレクトリ。
+            partition_by: パーティション列名のリスト（オプション）。
+                    指定した場合は列値ごとのディレクトリに分割して並列に書き出す。
+            compression: 圧縮方式（zstd, snappy, gzip, uncompressed等）
+            row_group_size: 行グループあたりの行数
 
         Examples:
             >>> client.export_to_parquet("SELECT * FROM sales", "output.parquet")
+            >>> client.export_to_parquet("SELECT * FROM sales", "sales_dir", partition_by=["year", "month"])
         """
         output_path = Path(output_file)
         logger.info(f"Exporting query result to Parquet: {output_path}")
 
+        options = [
+            "FORMAT PARQUET",
+            f"COMPRESSION {_quote_literal(compression)}",
+            f"ROW_GROUP_SIZE {int(row_group_size)}",
+        ]
+        if partition_by:
+            options.append(f"PARTITION_BY ({', '.join(_quote_name(col) for col in partition_by)})")
+
         # DuckDBの組み込みCOPY機能を使用
-        self.conn.execute(f"COPY ({query}) TO '{output_path}' (FORMAT PARQUET)")
+        self.conn.execute(
+            f"COPY ({_as_subquery(query)}) TO {_quote_literal(output_path)} ({', '.join(options)})"
+        )
 
         logger.info(f"Successfully exported to {output_path}")
 
-    def import_csv(self, csv_file: Union[str, Path], table_name: str) -> None:
+    def import_csv(
+        self,
+        csv_file: Union[str, Path],
+        table_name: str,
+        schema: Optional[Dict[str, str]] = None,
+        sample_size: Optional[int] = None,
+    ) -> None:
         """
         CSVファイルをテーブルにインポート
 
+        スキーマを指定した場合は型推定を行わず、テーブル作成後に
+        COPY ... FROM で直接ロードする。
+
         Args:
             csv_file: CSVファイルのパス
             table_name: インポート先テーブル名
+            schema: 列名→型名の辞書（オプション）。
+                    指定した場合はヘッダー付きCSVとして型推定なしでロードする。
+            sample_size: 型推定に使用する行数（オプション）。
+                    -1で全行を走査。schema指定時は無視される。
 
         Examples:
             >>> client.import_csv("data.csv", "users")
+            >>> client.import_csv("data.csv", "users", schema={"id": "INTEGER", "name": "VARCHAR"})
         """
         csv_path = Path(csv_file)
 
@@ -198,11 +582,65 @@ class DuckDBClient:
 
         logger.info(f"Importing CSV to table '{table_name}': {csv_path}")
 
-        query = f"CREATE TABLE {table_name} AS SELECT * FROM read_csv_auto('{csv_path}')"
-        self.execute_query(query)
+        table = _quote_identifier(table_name)
+
+        if schema:
+            columns = ", ".join(
+                f"{_quote_name(name)} {self._normalize_type(name, dtype)}" for name, dtype in schema.items()
+            )
+
+            # テーブル作成とロードを1トランザクションで行い、失敗時に空テーブルを残さない
+            # （対話モード等で既にトランザクション中の場合はその中で実行し、確定は呼び出し元に任せる）
+            own_transaction = not self._in_transaction()
+            if own_transaction:
+                self.conn.begin()
+            try:
+                self.execute_query_arrow(f"CREATE TABLE {table} ({columns})")
+                self.execute_query_arrow(f"COPY {table} FROM {_quote_literal(csv_path)} (FORMAT CSV, HEADER)")
+                if own_transaction:
+                    self.conn.commit()
+            except Exception:
+                if own_transaction:
+                    self.conn.rollback()
+                raise
+        else:
+            options = f", sample_size={int(sample_size)}" if sample_size is not None else ""
+            query = f"CREATE TABLE {table} AS SELECT * FROM read_csv_auto({_quote_literal(csv_path)}{options})"
+            self.execute_query_arrow(query)
 
         logger.info(f"Successfully imported {csv_path} to table '{table_name}'")
 
+    def _in_transaction(self) -> bool:
+        """
+        明示的なトランザクションが開始済みかどうかを判定
+
+        自動コミットでは文ごとに新しいトランザクションIDが振られるため、
+        連続する2文で同じIDが返る場合は開始済みとみなす。
+        """
+        query = "SELECT txid_current()"
+        return self.conn.execute(query).fetchone() == self.conn.execute(query).fetchone()
+
+    def _normalize_type(self, name: str, dtype: str) -> str:
+        """
+        列の型名をDuckDBの型パーサーで検証し、正規化した型名を返す
+
+        Args:
+            name: 列名（エラーメッセージ用）
+            dtype: 型名
+
+        Returns:
+            正規化した型名
+
+        Raises:
+            ValueError: 型名として解釈できない場合
+        """
+        import duckdb
+
+        try:
+            return str(self.conn.type(dtype))
+        except duckdb.Error as e:
+            raise ValueError(f"Invalid type for column '{name}': {dtype}") from e
+
     def import_parquet(self, parquet_file: Union[str, Path], table_name: str) -> None:
         """
         Parquetファイルをテーブルにインポート
@@ -221,13 +659,14 @@ class DuckDBClient:
 
         logger.info(f"Importing Parquet to table '{table_name}': {parquet_path}")
 
-        query = f"CREATE TABLE {table_name} AS SELECT * FROM read_parquet('{parquet_path}')"
-        self.execute_query(query)
+        table = _quote_identifier(table_name)
+        query = f"CREATE TABLE {table} AS SELECT * FROM read_parquet({_quote_literal(parquet_path)})"
+        self.execute_query_arrow(query)
 
         logger.info(f"Successfully imported {parquet_path} to table '{table_name}'")
 
     def close(self) -> None:
-        """データベース接続を閉じる"""
+        """データベース接続を閉じる（複数回呼び出しても安全）"""
         if self.conn:
             self.conn.close()
             logger.info("Database connection closed")
@@ -240,7 +679,3 @@ class DuckDBClient:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """コンテキストマネージャー: 自動クローズ"""
         self.close()
-
-    def __del__(self):
-        """デストラクタ: オブジェクト破棄時の自動クローズ"""
-        self.close()
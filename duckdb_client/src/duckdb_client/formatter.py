@@ -0,0 +1,301 @@
+"""
+DuckDB Client Formatter Module
+
+Arrow Tableを表形式のテキストに整形して表示するモジュール。
+"""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional
+
+# pyarrow は import コストが大きいため、表示時に遅延 import する
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+class _Line(NamedTuple):
+    """罫線の構成文字（左端, 塗り, 列区切り, 右端）"""
+    begin: str
+    fill: str
+    sep: str
+    end: str
+
+
+class _TableStyle(NamedTuple):
+    """表示スタイルの定義"""
+    top: Optional[_Line]
+    below_header: Optional[_Line]
+    between_rows: Optional[_Line]
+    bottom: Optional[_Line]
+    row: _Line
+    padding: int
+    align_markers: bool = False
+
+
+# 表示スタイル（tabulateの同名フォーマットと同じ見た目）
+TABLE_STYLES: Dict[str, _TableStyle] = {
+    'psql': _TableStyle(
+        top=_Line('+', '-', '+', '+'),
+        below_header=_Line('|', '-', '+', '|'),
+        between_rows=None,
+        bottom=_Line('+', '-', '+', '+'),
+        row=_Line('|', '', '|', '|'),
+        padding=1,
+    ),
+    'grid': _TableStyle(
+        top=_Line('+', '-', '+', '+'),
+        below_header=_Line('+', '=', '+', '+'),
+        between_rows=_Line('+', '-', '+', '+'),
+        bottom=_Line('+', '-', '+', '+'),
+        row=_Line('|', '', '|', '|'),
+        padding=1,
+    ),
+    'simple': _TableStyle(
+        top=None,
+        below_header=_Line('', '-', '  ', ''),
+        between_rows=None,
+        bottom=None,
+        row=_Line('', '', '  ', ''),
+        padding=0,
+    ),
+    'plain': _TableStyle(
+        top=None,
+        below_header=None,
+        between_rows=None,
+        bottom=None,
+        row=_Line('', '', '  ', ''),
+        padding=0,
+    ),
+    'markdown': _TableStyle(
+        top=None,
+        below_header=_Line('|', '-', '|', '|'),
+        between_rows=None,
+        bottom=None,
+        row=_Line('|', '', '|', '|'),
+        padding=1,
+        align_markers=True,
+    ),
+}
+
+
+# 表示を崩す制御文字のエスケープ（それ以外の制御文字は「?」に置換）
+_CONTROL_CHAR_ESCAPES = (("\n", "\\n"), ("\r", "\\r"), ("\t", "\\t"))
+_OTHER_CONTROL_CHARS = r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]"
+
+# 表示幅が2となる全角文字（Unicode East Asian Width が W/F の主な範囲、RE2の正規表現）
+_WIDE_CHARS = (
+    r"[\x{1100}-\x{115F}\x{2E80}-\x{303E}\x{3041}-\x{33FF}\x{3400}-\x{4DBF}"
+    r"\x{4E00}-\x{9FFF}\x{A000}-\x{A4CF}\x{AC00}-\x{D7A3}\x{F900}-\x{FAFF}"
+    r"\x{FE30}-\x{FE4F}\x{FF00}-\x{FF60}\x{FFE0}-\x{FFE6}\x{1F300}-\x{1F64F}"
+    r"\x{1F900}-\x{1F9FF}\x{20000}-\x{2FFFD}\x{30000}-\x{3FFFD}]"
+)
+
+
+def _is_arrow_castable(data_type: pa.DataType) -> bool:
+    """Arrowの文字列キャストで表示用に変換する型かどうかを判定"""
+    import pyarrow as pa
+
+    if pa.types.is_dictionary(data_type):
+        return _is_arrow_castable(data_type.value_type)
+    return (
+        pa.types.is_string(data_type)
+        or pa.types.is_large_string(data_type)
+        or pa.types.is_boolean(data_type)
+        or pa.types.is_null(data_type)
+        or pa.types.is_date(data_type)
+        or _is_numeric(data_type)
+    )
+
+
+def _escape_control_chars(strings: pa.ChunkedArray) -> pa.ChunkedArray:
+    """改行・タブ等の制御文字をエスケープ"""
+    import pyarrow.compute as pc
+
+    for char, escaped in _CONTROL_CHAR_ESCAPES:
+        strings = pc.replace_substring(strings, pattern=char, replacement=escaped)
+    return pc.replace_substring_regex(strings, pattern=_OTHER_CONTROL_CHARS, replacement="?")
+
+
+def _escape_header(header: str) -> str:
+    """列名の制御文字をセルと同じ規則でエスケープ"""
+    for char, escaped in _CONTROL_CHAR_ESCAPES:
+        header = header.replace(char, escaped)
+    return re.sub(_OTHER_CONTROL_CHARS, "?", header)
+
+
+def _to_strings(table: pa.Table) -> List[pa.ChunkedArray]:
+    """
+    各列を表示用の文字列列に変換
+
+    文字列・数値・日付はArrowの文字列キャストで変換する。
+    日時・BLOB・INTERVAL・MAP・LIST・STRUCT等はDuckDBのVARCHARキャストで
+    DuckDBと同じ表記にする。
+
+    Args:
+        table: 変換するArrow Table
+
+    Returns:
+        NULLを空文字にし、制御文字をエスケープした文字列列のリスト
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    columns = list(table.columns)
+    targets = [i for i, field in enumerate(table.schema) if not _is_arrow_castable(field.type)]
+    if targets:
+        import duckdb
+
+        # 列名の重複・特殊文字を避けるため位置ベースの名前で渡す
+        subset = pa.table({f"c{n}": table.column(i) for n, i in enumerate(targets)})
+        projection = ", ".join(f"CAST(c{n} AS VARCHAR) AS c{n}" for n in range(len(targets)))
+        with duckdb.connect() as conn:
+            relation = conn.from_arrow(subset).project(projection)
+            # to_arrow_table は新しいDuckDBでの名称（旧版は fetch_arrow_table のみ）
+            to_arrow_table = getattr(relation, "to_arrow_table", None) or relation.fetch_arrow_table
+            casted = to_arrow_table()
+        for n, i in enumerate(targets):
+            columns[i] = casted.column(n)
+
+    return [
+        _escape_control_chars(pc.fill_null(pc.cast(column, pa.string()), ""))
+        for column in columns
+    ]
+
+
+def _display_width(strings: pa.ChunkedArray) -> pa.ChunkedArray:
+    """端末上の表示幅（全角文字を幅2として数える）を計算"""
+    import pyarrow.compute as pc
+
+    return pc.add(pc.utf8_length(strings), pc.count_substring_regex(strings, pattern=_WIDE_CHARS))
+
+
+def _pad(strings: pa.ChunkedArray, display_widths: pa.ChunkedArray, width: int, right: bool) -> pa.ChunkedArray:
+    """表示幅が width になるよう空白で左詰め・右詰めする"""
+    import pyarrow.compute as pc
+
+    spaces = pc.binary_repeat(" ", pc.subtract(width, display_widths))
+    if right:
+        return pc.binary_join_element_wise(spaces, strings, "")
+    return pc.binary_join_element_wise(strings, spaces, "")
+
+
+def _is_numeric(data_type: pa.DataType) -> bool:
+    """数値型（右寄せ表示する型）かどうかを判定"""
+    import pyarrow as pa
+
+    return (
+        pa.types.is_integer(data_type)
+        or pa.types.is_floating(data_type)
+        or pa.types.is_decimal(data_type)
+    )
+
+
+def _render_line(line: _Line, widths: List[int], padding: int) -> str:
+    """罫線を1行分組み立てる"""
+    return line.begin + line.sep.join(line.fill * (w + 2 * padding) for w in widths) + line.end
+
+
+def _render_markers(line: _Line, widths: List[int], right_aligned: List[bool], padding: int) -> str:
+    """Markdownの配置指定付きヘッダー区切り線を組み立てる"""
+    cells = [
+        line.fill * (w + 2 * padding - 1) + ':' if right else ':' + line.fill * (w + 2 * padding - 1)
+        for w, right in zip(widths, right_aligned)
+    ]
+    return line.begin + line.sep.join(cells) + line.end
+
+
+def format_arrow(table: pa.Table, style: str = "psql") -> str:
+    """
+    Arrow Tableを表形式のテキストに整形
+
+    列幅（全角文字を幅2とする表示幅）の計算・パディング・行の連結はArrowの
+    計算関数で列単位に行い、セルごとのPython処理を行わない。
+
+    Args:
+        table: 整形するArrow Table
+        style: テーブル表示スタイル（psql, grid, simple, plain, markdown）
+
+    Returns:
+        整形済みのテキスト
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    table_style = TABLE_STYLES[style]
+    headers = [_escape_header(str(name)) for name in table.column_names]
+    header_widths = _display_width(pa.chunked_array([headers], type=pa.string())).to_pylist()
+    right_aligned = [_is_numeric(field.type) for field in table.schema]
+
+    widths = []
+    cells = []
+    for header_width, strings, right in zip(header_widths, _to_strings(table), right_aligned):
+        display_widths = _display_width(strings)
+        width = max(header_width, pc.max(display_widths).as_py() or 0)
+        widths.append(width)
+        cells.append(_pad(strings, display_widths, width, right))
+
+    padding = ' ' * table_style.padding
+    row = table_style.row
+    row_begin = row.begin + padding
+    row_sep = padding + row.sep + padding
+    row_end = padding + row.end
+
+    header_cells = [
+        ' ' * (width - header_width) + header if right else header + ' ' * (width - header_width)
+        for header, header_width, width, right in zip(headers, header_widths, widths, right_aligned)
+    ]
+
+    lines = []
+    if table_style.top:
+        lines.append(_render_line(table_style.top, widths, table_style.padding))
+    lines.append(row_begin + row_sep.join(header_cells) + row_end)
+    if table_style.below_header:
+        if table_style.align_markers:
+            lines.append(_render_markers(table_style.below_header, widths, right_aligned, table_style.padding))
+        else:
+            lines.append(_render_line(table_style.below_header, widths, table_style.padding))
+
+    between_rows = (
+        _render_line(table_style.between_rows, widths, table_style.padding)
+        if table_style.between_rows else None
+    )
+    # 各行のセル連結と両端の罫線付与を列単位で一括実行
+    rows = pc.binary_join_element_wise(*cells, row_sep)
+    rows = pc.binary_join_element_wise(row_begin, rows, row_end, "").to_pylist()
+
+    if between_rows:
+        for i, line in enumerate(rows):
+            if i > 0:
+                lines.append(between_rows)
+            lines.append(line)
+    else:
+        lines.extend(rows)
+
+    if table_style.bottom:
+        lines.append(_render_line(table_style.bottom, widths, table_style.padding))
+
+    return "\n".join(lines)
+
+
+def print_arrow(table: pa.Table, style: str = "psql", max_rows: Optional[int] = None) -> None:
+    """
+    Arrow Tableを整形して表示
+
+    Args:
+        table: 表示するArrow Table
+        style: テーブル表示スタイル（psql, grid, simple, plain, markdown）
+        max_rows: 表示する最大行数。Noneの場合は全行を表示。
+                超過分は表示せず、さらに行があることのみを示す。
+    """
+    num_rows = table.num_rows
+    if num_rows == 0:
+        print("No results.")
+        return
+
+    if max_rows is not None and num_rows > max_rows:
+        print(format_arrow(table.slice(0, max_rows), style))
+        print(f"\n(showing first {max_rows} rows; more rows available)")
+    else:
+        print(format_arrow(table, style))
+        print(f"\n({num_rows} rows)")
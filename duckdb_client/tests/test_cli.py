@@ -0,0 +1,239 @@
+"""CLIのテスト"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from duckdb_client.cli import _is_read_only, _sniff_subcommand, cmd_repl, create_parser, main
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.mark.parametrize('argv, expected', [
+    (['tables'], 'tables'),
+    (['--db', 'x.duckdb', 'query', 'SELECT 1'], 'query'),
+    (['--db=x.duckdb', 'describe', 't'], 'describe'),
+    (['-v', 'sample', 't'], 'sample'),
+    (['--verbose', '--db', 'x.duckdb', 'file', 'q.sql'], 'file'),
+    (['--threads', '2', '--memory-limit=1GB', '--preserve-order', 'tables'], 'tables'),
+])
+def test_sniff_subcommand(argv, expected):
+    assert _sniff_subcommand(argv) == expected
+
+
+@pytest.mark.parametrize('argv', [
+    [],
+    ['--help'],
+    ['-h', 'tables'],
+    ['--unknown', 'tables'],
+    ['unknown'],
+    ['--db'],
+])
+def test_sniff_subcommand_falls_back(argv):
+    assert _sniff_subcommand(argv) is None
+
+
+def test_create_parser_registers_only_sniffed_command():
+    parser = create_parser('tables')
+    args = parser.parse_args(['--db', 'x.duckdb', 'tables'])
+    assert args.command == 'tables'
+    with pytest.raises(SystemExit):
+        parser.parse_args(['query', 'SELECT 1'])
+
+
+def test_help_skips_heavy_imports():
+    code = (
+        "import sys\n"
+        "from duckdb_client import cli\n"
+        "sys.argv = ['duckdb-cli', '--help']\n"
+        "try:\n"
+        "    cli.main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(sorted(m for m in ('duckdb', 'pandas', 'tabulate') if m in sys.modules))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True,
+        env={**os.environ, 'PYTHONPATH': str(PROJECT_DIR / 'src')},
+    ).stdout
+    assert out.splitlines()[-1] == '[]'
+
+
+
+def _feed_input(monkeypatch, lines):
+    """input() が指定行を順に返し、最後に EOFError を送出するようにする"""
+    it = iter(lines)
+
+    def fake_input(prompt=''):
+        try:
+            return next(it)
+        except StopIteration:
+            raise EOFError
+    monkeypatch.setattr('builtins.input', fake_input)
+
+
+def test_repl_reuses_connection(monkeypatch, tmp_path):
+    out_csv = tmp_path / 'out.csv'
+    _feed_input(monkeypatch, [
+        "CREATE TABLE users AS SELECT 42 AS answer",
+        "SELEC oops",
+        "describe missing",
+        f"export-csv 'SELECT answer FROM users' '{out_csv}'",
+        "exit",
+        "CREATE TABLE not_reached (a INTEGER)",
+    ])
+    db = str(tmp_path / 'repl.duckdb')
+    monkeypatch.setattr(sys, 'argv', ['duckdb-cli', '--db', db, 'repl'])
+    main()
+    assert out_csv.read_text().splitlines() == ['answer', '42']
+
+    from duckdb_client.client import DuckDBClient
+    with DuckDBClient(db) as client:
+        tables = client.execute_query_arrow("SELECT table_name FROM duckdb_tables()")
+    assert tables.column('table_name').to_pylist() == ['users']
+
+
+def test_repl_interrupt_keeps_session(monkeypatch, capsys):
+    class FakeConnection:
+        interrupted = 0
+
+        def interrupt(self):
+            self.interrupted += 1
+
+    class FakeClient:
+        conn = FakeConnection()
+        calls = 0
+
+        def execute_query_arrow(self, query, **kwargs):
+            self.calls += 1
+            raise KeyboardInterrupt
+
+    client = FakeClient()
+    _feed_input(monkeypatch, ["SELECT 1", "SELECT 2"])
+    cmd_repl(client, None)
+    assert client.calls == 2
+    assert client.conn.interrupted == 2
+    assert capsys.readouterr().out.count('Interrupted.') == 2
+
+
+def test_column_spec():
+    args = create_parser('import-csv').parse_args(
+        ['import-csv', 'data.csv', 'users', '--column', 'id:INTEGER', '--column', 'name:VARCHAR']
+    )
+    assert args.columns == [('id', 'INTEGER'), ('name', 'VARCHAR')]
+
+
+@pytest.mark.parametrize('value', ['id', ':INTEGER', 'id:'])
+def test_column_spec_rejects_invalid(value):
+    with pytest.raises(SystemExit):
+        create_parser('import-csv').parse_args(['import-csv', 'data.csv', 'users', '--column', value])
+
+
+def run_cli(monkeypatch, capsys, *argv):
+    monkeypatch.setattr(sys, 'argv', ['duckdb-cli', *argv])
+    main()
+    return capsys.readouterr().out
+
+
+def test_cli_end_to_end(monkeypatch, capsys, tmp_path):
+    db = str(tmp_path / 'test.duckdb')
+    csv_file = tmp_path / 'users.csv'
+    csv_file.write_text("id,name\n1,alice\n2,bob\n3,carol\n")
+
+    run_cli(monkeypatch, capsys, '--db', db, 'import-csv', str(csv_file), 'users')
+
+    out = run_cli(monkeypatch, capsys, '--db', db, 'tables', '--format', 'plain')
+    assert out.split('\n')[:2] == ['name ', 'users']
+
+    out = run_cli(
+        monkeypatch, capsys, '--db', db, 'query',
+        "INSERT INTO users VALUES (4, 'dave'); SELECT count(*) AS n FROM users",
+        '--format', 'plain',
+    )
+    assert out.split('\n')[:2] == ['n', '4']
+
+    out = run_cli(monkeypatch, capsys, '--db', db, 'sample', 'users', '--limit', '2')
+    assert '(2 rows)' in out
+
+    parquet_file = tmp_path / 'users.parquet'
+    run_cli(monkeypatch, capsys, '--db', db, 'export-parquet', 'SELECT * FROM users', str(parquet_file))
+    run_cli(monkeypatch, capsys, '--db', db, 'import-parquet', str(parquet_file), 'users_copy')
+
+    out = run_cli(
+        monkeypatch, capsys, '--db', db, 'query',
+        'SELECT name FROM users_copy ORDER BY id', '--format', 'plain', '--max-rows', '2',
+    )
+    assert out.split('\n')[:3] == ['name ', 'alice', 'bob  ']
+    assert out.count('more rows available') == 1
+
+
+def test_cli_query_failure_exits(monkeypatch, capsys, tmp_path):
+    with pytest.raises(SystemExit) as excinfo:
+        run_cli(monkeypatch, capsys, '--db', str(tmp_path / 'test.duckdb'), 'query', 'SELECT * FROM missing')
+    assert excinfo.value.code == 1
+
+
+def test_import_commands_skip_pandas(tmp_path):
+    csv_file = tmp_path / 'users.csv'
+    csv_file.write_text("id,name\n1,alice\n")
+    code = (
+        "import sys\n"
+        "from duckdb_client import cli\n"
+        f"for argv in (['import-csv', {str(csv_file)!r}, 'users'],\n"
+        f"             ['import-csv', {str(csv_file)!r}, 'typed', '--column', 'id:INTEGER', '--column', 'name:VARCHAR']):\n"
+        f"    sys.argv = ['duckdb-cli', '--db', {str(tmp_path / 'test.duckdb')!r}, *argv]\n"
+        "    cli.main()\n"
+        "print('pandas' in sys.modules)\n"
+    )
+    out = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True,
+        env={**os.environ, 'PYTHONPATH': str(PROJECT_DIR / 'src')},
+    ).stdout
+    assert out.splitlines()[-1] == 'False'
+
+
+def test_export_parquet_options():
+    args = create_parser('export-parquet').parse_args(
+        ['export-parquet', 'SELECT 1', 'out', '--partition-by', 'year, month', '--compression', 'snappy']
+    )
+    assert args.partition_by == ['year', 'month']
+    assert args.compression == 'snappy'
+
+
+@pytest.mark.parametrize('query, expected', [
+    ("SELECT * FROM users", True),
+    ("SHOW TABLES", True),
+    ("WITH c AS (SELECT 5 AS id) INSERT INTO users SELECT id, 'eve' FROM c", False),
+    ("SELECT 1; CREATE TABLE other (a INTEGER)", False),
+    ("SELECT nextval('seq')", False),
+])
+def test_is_read_only(tmp_path, query, expected):
+    db = tmp_path / 'test.duckdb'
+    db.touch()
+    args = create_parser('query').parse_args(['--db', str(db), 'query', query])
+    assert _is_read_only(args) is expected
+
+
+def test_is_read_only_commands(tmp_path):
+    db = tmp_path / 'test.duckdb'
+    assert not _is_read_only(create_parser('tables').parse_args(['--db', str(db), 'tables']))
+    db.touch()
+    assert _is_read_only(create_parser('tables').parse_args(['--db', str(db), 'tables']))
+    assert not _is_read_only(create_parser('import-csv').parse_args(['--db', str(db), 'import-csv', 'a.csv', 't']))
+    assert not _is_read_only(create_parser('tables').parse_args(['tables']))
+
+
+def test_cli_writes_are_not_opened_read_only(monkeypatch, capsys, tmp_path):
+    db = str(tmp_path / 'test.duckdb')
+    run_cli(monkeypatch, capsys, '--db', db, 'query', "CREATE TABLE users (id INTEGER, name VARCHAR); CREATE SEQUENCE seq")
+    for query in (
+        "WITH c AS (SELECT 5 AS id) INSERT INTO users SELECT id, 'eve' FROM c",
+        "SELECT 1; INSERT INTO users VALUES (6, 'frank')",
+        "SELECT nextval('seq') AS n",
+    ):
+        run_cli(monkeypatch, capsys, '--db', db, 'query', query)
+    out = run_cli(monkeypatch, capsys, '--db', db, 'query', "SELECT count(*) AS n FROM users", '--format', 'plain')
+    assert out.split('\n')[:2] == ['n', '2']
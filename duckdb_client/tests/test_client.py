@@ -0,0 +1,299 @@
+"""DuckDBClient のテスト"""
+
+import duckdb
+import pytest
+
+from duckdb_client.client import DuckDBClient, _is_read_only_query, _quote_identifier, _returns_rows
+
+
+@pytest.fixture
+def client():
+    with DuckDBClient() as c:
+        c.execute_query("CREATE TABLE t AS SELECT range AS id, 'v' || range AS name FROM range(5)")
+        yield c
+
+
+def test_execute_query_arrow(client):
+    result = client.execute_query_arrow("SELECT id, name FROM t WHERE id < 2 ORDER BY id")
+    assert result.column_names == ['id', 'name']
+    assert result.to_pylist() == [{'id': 0, 'name': 'v0'}, {'id': 1, 'name': 'v1'}]
+
+
+def test_execute_query_returns_dataframe(client):
+    df = client.execute_query("SELECT count(*) AS n FROM t")
+    assert df['n'].tolist() == [5]
+
+
+def test_export_to_csv(client, tmp_path):
+    csv_file = tmp_path / 'out.csv'
+    client.export_to_csv("SELECT * FROM t WHERE id < 2 ORDER BY id", str(csv_file))
+    assert csv_file.read_text().splitlines() == ['id,name', '0,v0', '1,v1']
+
+
+def test_export_to_csv_quotes_path(client, tmp_path):
+    csv_file = tmp_path / "it's.csv"
+    client.export_to_csv("SELECT 1 AS a", str(csv_file))
+    assert csv_file.read_text().splitlines() == ['a', '1']
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('users', '"users"'),
+    ('main.users', '"main"."users"'),
+    ('"my.t"', '"my.t"'),
+    ('main."my.t"', '"main"."my.t"'),
+    ('"a""b".t', '"a""b"."t"'),
+    ('we"ird', '"we""ird"'),
+])
+def test_quote_identifier(name, expected):
+    assert _quote_identifier(name) == expected
+
+
+def test_sample_and_describe_dotted_table(client):
+    client.execute_query('CREATE TABLE "my.t" AS SELECT range AS id FROM range(20)')
+    assert len(client.get_table_sample('"my.t"', 3)) == 3
+    assert client.describe_table('"my.t"')['column_name'].tolist() == ['id']
+    assert len(client.get_table_sample('main.t', 2)) == 2
+
+
+@pytest.fixture
+def users_csv(tmp_path):
+    csv_file = tmp_path / 'users.csv'
+    csv_file.write_text("id,name\n1,alice\n2,bob\n")
+    return csv_file
+
+
+def test_import_csv_with_schema(client, users_csv):
+    client.import_csv(users_csv, 'users', schema={'id': 'int', 'name': 'varchar'})
+    described = client.describe_table('users')
+    assert described['column_type'].tolist() == ['INTEGER', 'VARCHAR']
+    assert len(client.get_table_sample('users')) == 2
+
+
+def test_import_csv_inside_open_transaction(client, users_csv):
+    client.execute_query("BEGIN TRANSACTION")
+    client.import_csv(users_csv, 'users', schema={'id': 'INTEGER', 'name': 'VARCHAR'})
+    client.execute_query("ROLLBACK")
+    # 呼び出し元のトランザクションに含まれるため、ロールバックでテーブルも消える
+    tables = client.execute_query("SELECT table_name FROM duckdb_tables()")
+    assert 'users' not in tables['table_name'].tolist()
+
+
+@pytest.mark.parametrize('dtype', ['nosuch', 'VARCHAR); DROP TABLE t; --'])
+def test_import_csv_rejects_invalid_type(client, users_csv, dtype):
+    with pytest.raises(ValueError):
+        client.import_csv(users_csv, 'users', schema={'id': 'INTEGER', 'name': dtype})
+    assert len(client.get_table_sample('t')) == 5
+
+
+def test_import_csv_failure_leaves_no_table(client, tmp_path):
+    csv_file = tmp_path / 'bad.csv'
+    csv_file.write_text("id\nnot-a-number\n")
+    with pytest.raises(Exception):
+        client.import_csv(csv_file, 'bad', schema={'id': 'INTEGER'})
+    tables = client.execute_query("SELECT table_name FROM duckdb_tables()")
+    assert 'bad' not in tables['table_name'].tolist()
+
+
+def test_import_csv_sample_size(client, users_csv):
+    client.import_csv(users_csv, 'users', sample_size=-1)
+    assert client.describe_table('users')['column_name'].tolist() == ['id', 'name']
+
+
+def test_execute_file_multi_statement(client, tmp_path):
+    sql_file = tmp_path / 'script.sql'
+    sql_file.write_text(
+        "-- 途中の文の結果は取得しない\n"
+        "CREATE TABLE notes (body VARCHAR);\n"
+        "INSERT INTO notes VALUES ('a; b'), ('c');\n"
+        "SELECT count(*) AS n, max(body) AS last FROM notes;\n"
+    )
+    result = client.execute_file_arrow(sql_file)
+    assert result.to_pylist() == [{'n': 2, 'last': 'c'}]
+
+
+@pytest.mark.parametrize('content', ['', '-- comment only\n'])
+def test_execute_file_empty(client, tmp_path, content):
+    sql_file = tmp_path / 'empty.sql'
+    sql_file.write_text(content)
+    assert client.execute_file_arrow(sql_file).num_rows == 0
+
+
+def test_execute_file_missing(client, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        client.execute_file_arrow(tmp_path / 'missing.sql')
+
+
+def _setting(client, name):
+    return client.execute_query_arrow(f"SELECT current_setting('{name}') AS v").column('v')[0].as_py()
+
+
+def test_connect_config():
+    with DuckDBClient(threads=2, memory_limit='1GB', preserve_insertion_order=True) as c:
+        assert _setting(c, 'threads') == 2
+        # 1GB = 10^9 バイト
+        assert _setting(c, 'memory_limit') in ('953.6 MiB', '953.6MB')
+        assert _setting(c, 'preserve_insertion_order') is True
+        assert _setting(c, 'enable_progress_bar') is False
+
+
+def test_connect_config_defaults(tmp_path):
+    with DuckDBClient(tmp_path / 'test.duckdb') as c:
+        assert _setting(c, 'preserve_insertion_order') is False
+        assert _setting(c, 'enable_progress_bar') is False
+
+
+def test_close_is_idempotent():
+    c = DuckDBClient()
+    c.close()
+    c.close()
+    assert c.conn is None
+
+
+def test_context_manager_closes(tmp_path):
+    with DuckDBClient(tmp_path / 'test.duckdb') as c:
+        pass
+    assert c.conn is None
+    assert not hasattr(DuckDBClient, '__del__')
+
+
+def test_execute_query_arrow_backed_dtypes(client):
+    import pandas as pd
+
+    df = client.execute_query("SELECT id, name, NULL::INTEGER AS missing FROM t ORDER BY id")
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+    assert df['name'].tolist() == ['v0', 'v1', 'v2', 'v3', 'v4']
+    assert df['missing'].isna().all()
+
+
+def _statement(query):
+    return duckdb.extract_statements(query)[-1]
+
+
+@pytest.mark.parametrize('query', [
+    "SELECT 1",
+    "  select 1",
+    "WITH t AS (SELECT 1) SELECT * FROM t",
+    "FROM range(3)",
+    "SHOW TABLES",
+    "DESCRIBE SELECT 1",
+    "EXPLAIN SELECT 1",
+    "PRAGMA show_tables",
+    "INSERT INTO t VALUES (1) RETURNING *",
+])
+def test_returns_rows(query):
+    assert _returns_rows(_statement(query))
+
+
+@pytest.mark.parametrize('query', [
+    "CREATE TABLE t (a INTEGER)",
+    "INSERT INTO t VALUES (1)",
+    "UPDATE t SET a = 2",
+    "DELETE FROM t",
+    "DROP TABLE t",
+    "SET threads = 1",
+    "BEGIN TRANSACTION",
+    "COPY t TO 'out.csv'",
+    "/* comment */ CREATE TABLE t (a INTEGER)",
+])
+def test_returns_no_rows(query):
+    assert not _returns_rows(_statement(query))
+
+
+def test_execute_query_arrow_multi_statement(client):
+    result = client.execute_query_arrow("CREATE TABLE q AS SELECT 42 AS x; SELECT * FROM q")
+    assert result.to_pylist() == [{'x': 42}]
+
+
+def test_execute_query_arrow_skips_fetch_for_ddl(client):
+    result = client.execute_query_arrow("SELECT 1; INSERT INTO t VALUES (5, 'v5')")
+    assert result.num_rows == 0
+    assert client.execute_query_arrow("SELECT count(*) AS n FROM t").to_pylist() == [{'n': 6}]
+    assert client.execute_query("DROP TABLE t").empty
+
+
+def test_import_parquet_quotes_path_and_table(client, tmp_path):
+    parquet_file = tmp_path / "it's.parquet"
+    client.execute_query(f"COPY t TO '{str(parquet_file).replace(chr(39), chr(39) * 2)}' (FORMAT PARQUET)")
+    client.import_parquet(parquet_file, '"my.copy"')
+    assert len(client.get_table_sample('"my.copy"')) == 5
+
+
+def _parquet_codecs(client, path):
+    result = client.execute_query_arrow(f"SELECT DISTINCT compression FROM parquet_metadata('{path}')")
+    return result.column('compression').to_pylist()
+
+
+def test_export_to_parquet_defaults(client, tmp_path):
+    parquet_file = tmp_path / 'out.parquet'
+    client.export_to_parquet("SELECT * FROM t", parquet_file)
+    assert _parquet_codecs(client, parquet_file) == ['ZSTD']
+
+
+def test_export_to_parquet_compression(client, tmp_path):
+    parquet_file = tmp_path / 'out.parquet'
+    client.export_to_parquet("SELECT * FROM range(5000)", parquet_file, compression='snappy', row_group_size=2048)
+    assert _parquet_codecs(client, parquet_file) == ['SNAPPY']
+    row_groups = client.execute_query_arrow(
+        f"SELECT count(DISTINCT row_group_id) AS n FROM parquet_metadata('{parquet_file}')"
+    )
+    assert row_groups.to_pylist() == [{'n': 3}]
+
+
+def test_export_to_parquet_partition_by(client, tmp_path):
+    out_dir = tmp_path / 'parts'
+    client.export_to_parquet(
+        "SELECT id, id % 2 AS parity, 'x' AS kind FROM t", out_dir, partition_by=['parity', 'kind']
+    )
+    partitions = sorted(str(p.parent.relative_to(out_dir)) for p in out_dir.rglob('*.parquet'))
+    assert partitions == ['parity=0/kind=x', 'parity=1/kind=x']
+    files = [str(p) for p in out_dir.rglob('*.parquet')]
+    assert all(_parquet_codecs(client, f) == ['ZSTD'] for f in files)
+    total = client.execute_query_arrow(f"SELECT count(*) AS n FROM read_parquet('{out_dir}/**/*.parquet')")
+    assert total.to_pylist() == [{'n': 5}]
+
+
+def test_execute_query_arrow_max_rows(client):
+    # 続きの有無を判定するため max_rows + 1 行まで取得する
+    result = client.execute_query_arrow("SELECT * FROM range(100000)", max_rows=2)
+    assert result.num_rows == 3
+    assert client.execute_query_arrow("SELECT * FROM t", max_rows=10).num_rows == 5
+
+
+def test_execute_file_arrow_max_rows(client, tmp_path):
+    sql_file = tmp_path / 'script.sql'
+    sql_file.write_text("CREATE TABLE big AS SELECT * FROM range(10000);\nSELECT * FROM big;\n")
+    assert client.execute_file_arrow(sql_file, max_rows=5).num_rows == 6
+
+
+@pytest.mark.parametrize('query', [
+    "SELECT 1",
+    "WITH t AS (SELECT 1) SELECT * FROM t",
+    "FROM range(3)",
+    "SHOW TABLES",
+    "SUMMARIZE SELECT 1",
+    "EXPLAIN SELECT 1",
+])
+def test_is_read_only_query(query):
+    assert _is_read_only_query(query)
+
+
+@pytest.mark.parametrize('query', [
+    "INSERT INTO t VALUES (1)",
+    "WITH t AS (SELECT 1) INSERT INTO u SELECT * FROM t",
+    "SELECT 1; CREATE TABLE t (a INTEGER)",
+    "SELECT nextval('seq')",
+    "EXPLAIN ANALYZE SELECT 1",
+    "SELEC 1",
+])
+def test_is_not_read_only_query(query):
+    assert not _is_read_only_query(query)
+
+
+def test_read_only_client_rejects_writes(tmp_path):
+    db = tmp_path / 'test.duckdb'
+    with DuckDBClient(db) as c:
+        c.execute_query("CREATE TABLE t AS SELECT 1 AS a")
+    with DuckDBClient(db, read_only=True) as c:
+        assert c.execute_query_arrow("SELECT a FROM t").to_pylist() == [{'a': 1}]
+        with pytest.raises(duckdb.Error):
+            c.execute_query("INSERT INTO t VALUES (2)")
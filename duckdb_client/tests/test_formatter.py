@@ -0,0 +1,101 @@
+"""format_arrow / print_arrow のテスト"""
+
+import pyarrow as pa
+import pytest
+
+from duckdb_client.client import DuckDBClient
+from duckdb_client.formatter import format_arrow, print_arrow
+
+
+@pytest.fixture
+def table():
+    return pa.table({'id': [1, 22], 'name': ['a', None]})
+
+
+@pytest.mark.parametrize('style, expected', [
+    ('psql', [
+        '+----+------+',
+        '| id | name |',
+        '|----+------|',
+        '|  1 | a    |',
+        '| 22 |      |',
+        '+----+------+',
+    ]),
+    ('grid', [
+        '+----+------+',
+        '| id | name |',
+        '+====+======+',
+        '|  1 | a    |',
+        '+----+------+',
+        '| 22 |      |',
+        '+----+------+',
+    ]),
+    ('simple', [
+        'id  name',
+        '--  ----',
+        ' 1  a   ',
+        '22      ',
+    ]),
+    ('plain', [
+        'id  name',
+        ' 1  a   ',
+        '22      ',
+    ]),
+    ('markdown', [
+        '| id | name |',
+        '|---:|:-----|',
+        '|  1 | a    |',
+        '| 22 |      |',
+    ]),
+])
+def test_format_arrow_styles(table, style, expected):
+    assert format_arrow(table, style).split('\n') == expected
+
+
+def test_format_arrow_escapes_control_characters():
+    table = pa.table({'a\tb': ['x\ny', 'nul\x00'], 'n': [1, 2]})
+    assert format_arrow(table, 'plain').split('\n') == [
+        'a\\tb  n',
+        'x\\ny  1',
+        'nul?  2',
+    ]
+
+
+def test_format_arrow_uses_duckdb_casts():
+    with DuckDBClient() as client:
+        table = client.execute_query_arrow(
+            "SELECT INTERVAL 1 DAY AS iv, MAP {'a': 1} AS m, '\\x00'::BLOB AS b, "
+            "[1, 2] AS l, {'k': 1} AS s, TIMESTAMP '2024-01-02 03:04:05' AS ts, TIME '03:04:05.5' AS t"
+        )
+    assert format_arrow(table, 'plain').split('\n')[1] == (
+        "1 day  {a=1}  \\x00  [1, 2]  {'k': 1}  2024-01-02 03:04:05  03:04:05.5"
+    )
+
+
+def test_format_arrow_east_asian_width():
+    table = pa.table({'名前': ['日本語', 'abc'], 'n': [1, 2]})
+    assert format_arrow(table, 'psql').split('\n') == [
+        '+--------+---+',
+        '| 名前   | n |',
+        '|--------+---|',
+        '| 日本語 | 1 |',
+        '| abc    | 2 |',
+        '+--------+---+',
+    ]
+
+
+def test_print_arrow_empty(capsys):
+    print_arrow(pa.table({'a': pa.array([], pa.int64())}))
+    assert capsys.readouterr().out == "No results.\n"
+
+
+def test_print_arrow_row_count(table, capsys):
+    print_arrow(table, 'plain')
+    assert capsys.readouterr().out.endswith("(2 rows)\n")
+
+
+def test_print_arrow_max_rows(table, capsys):
+    print_arrow(table, 'plain', max_rows=1)
+    out = capsys.readouterr().out
+    assert '22' not in out
+    assert out.endswith("(showing first 1 rows; more rows available)\n")